@@ -1,53 +1,24 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-try:
-    from setuptools import setup
-except ImportError:
-    from distutils.core import setup
-
 
 def parse_requirements(filename):
     """ load requirements from a pip requirements file """
-    lineiter = (line.strip() for line in open(filename))
-    return [line for line in lineiter if line and not line.startswith("#")]
+    with open(filename) as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
 
 
-with open('README.rst') as readme_file:
-    readme = readme_file.read()
-
-with open('HISTORY.rst') as history_file:
-    history = history_file.read()
+if __name__ == '__main__':
+    from setuptools import setup
 
-requirements = parse_requirements('requirements.txt')
-test_requirements = parse_requirements('requirements_dev.txt')
+    requirements = parse_requirements('requirements.txt')
+    test_requirements = parse_requirements('requirements_dev.txt')
 
-setup(
-    name='swagger_parser',
-    version='1.0.2',
-    description="Swagger parser giving useful informations about your swagger files",
-    long_description=readme + '\n\n' + history,
-    author="Cyprien Guillemot",
-    author_email='cyprien.guillemot@gmail.com',
-    url='https://github.com/Trax-air/swagger-parser',
-    packages=[
-        'swagger_parser',
-    ],
-    package_dir={'swagger_parser':
-                 'swagger_parser'},
-    include_package_data=True,
-    setup_requires=['pytest-runner'],
-    install_requires=requirements,
-    license="MIT",
-    zip_safe=False,
-    keywords='swagger, parser, API, REST, swagger-parser',
-    classifiers=[
-        'Development Status :: 5 - Production/Stable',
-        'Intended Audience :: Developers',
-        'License :: OSI Approved :: MIT License',
-        'Natural Language :: English',
-        'Programming Language :: Python :: 3'
-    ],
-    test_suite='tests',
-    tests_require=test_requirements
-)
+    # Static metadata lives in setup.cfg; requirements are still read here because
+    # `file:` for install_requires needs a newer setuptools than py36 ships with.
+    setup(
+        version='1.0.2',
+        install_requires=requirements,
+        tests_require=test_requirements
+    )
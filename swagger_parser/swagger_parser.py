@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import codecs
+import collections
 import datetime
+import functools
 import hashlib
 import jinja2
 import json
 import logging
+import os
 import re
 import six
 import sys
@@ -18,8 +21,86 @@ try:
 except ImportError:  # Python 3
     from io import StringIO
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 from swagger_spec_validator.validator20 import validate_spec
 
+_DEFINITION_REF_RE = re.compile('#/definitions/(.*)')
+_PATH_PARAMETER_RE = re.compile('{[^/]*}')
+_JINJA_MARKERS = ('{{', '{%', '{#')
+# Latest validated specification of the most recently used swagger files:
+# abspath -> ((mtime, size), specification), least recently used first
+_SPECIFICATION_CACHE = collections.OrderedDict()
+_SPECIFICATION_CACHE_SIZE = 8
+# Response of get_request_data when no status code is specified (copied before being returned)
+_DEFAULT_RESPONSE = {400: ''}
+# Load-time index of the parameters and responses of one action (see SwaggerParser._build_action_index)
+_ActionIndex = collections.namedtuple('_ActionIndex', [
+    'body', 'required_body', 'required_query', 'text_accepted', 'json_accepted', 'body_example', 'responses'])
+_BOOLEAN_STRINGS = frozenset(('true', 'false'))
+# Keys of a property spec giving its example directly, by priority
+_EXAMPLE_KEYS = ('example', 'x-example', 'default')
+_BASIC_TYPE_EXAMPLES = {
+    'integer': (42, 24),
+    'number': (5.5, 5.5),
+    'string': ('string', 'string2'),
+    'datetime': ('2015-08-28T09:02:57.481Z', '2015-08-28T09:02:57.481Z'),
+    'boolean': (False, True),
+    'null': ('null', 'null'),
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_definition_name(ref):
+    # Memoized as the same $ref values are resolved on every validation
+    return _DEFINITION_REF_RE.sub(r'\1', ref)
+
+
+def _check_integer(value):
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, six.integer_types):
+        return True
+    if isinstance(value, (six.text_type, six.string_types)):
+        try:
+            # We accept string with integer ex: '123'
+            int(value)
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+def _check_number(value):
+    return isinstance(value, (six.integer_types, float)) and not isinstance(value, bool)
+
+
+def _check_string(value):
+    return isinstance(value, (six.text_type, six.string_types, datetime.datetime))
+
+
+def _check_boolean(value):
+    return (isinstance(value, bool) or
+            (isinstance(value, (six.text_type, six.string_types,)) and
+             len(value) in (4, 5) and value.lower() in _BOOLEAN_STRINGS)
+            )
+
+
+def _check_unknown(value):
+    return False
+
+
+# Value checkers of SwaggerParser.check_type, by swagger type
+_TYPE_CHECKERS = {
+    'integer': _check_integer,
+    'number': _check_number,
+    'string': _check_string,
+    'boolean': _check_boolean,
+}
+
 
 class SwaggerParser(object):
     """Parse a swagger YAML file.
@@ -33,9 +114,10 @@ class SwaggerParser(object):
         paths: dict of path with their actions, parameters, and responses.
     """
 
-    _HTTP_VERBS = set(['get', 'put', 'post', 'delete', 'options', 'head', 'patch'])
+    _HTTP_VERBS = frozenset(('get', 'put', 'post', 'delete', 'options', 'head', 'patch'))
 
-    def __init__(self, swagger_path=None, swagger_dict=None, swagger_yaml=None, use_example=True):
+    def __init__(self, swagger_path=None, swagger_dict=None, swagger_yaml=None, use_example=True,
+                 lazy_examples=False):
         """Run parsing from either a file or a dict.
 
         Args:
@@ -45,28 +127,53 @@ class SwaggerParser(object):
                          build definitions example (False value can be useful
                          when making test. Problem can happen if set to True, eg
                          POST {'id': 'example'}, GET /string => 404).
+            lazy_examples: If True, definition examples are built the first
+                           time they are needed instead of all at init.
 
         Raises:
             - ValueError: if no swagger_path or swagger_dict is specified.
                           Or if the given swagger is not valid.
         """
         try:
+            cache_path = cached = None
             if swagger_path is not None:
-                # Open yaml file
-                arguments = {}
-                with codecs.open(swagger_path, 'r', 'utf-8') as swagger_yaml:
-                    swagger_template = swagger_yaml.read()
-                    swagger_string = jinja2.Template(swagger_template).render(**arguments)
-                    self.specification = yaml.safe_load(swagger_string)
-            elif swagger_yaml is not None:
-                json_ = yaml.safe_load(swagger_yaml)
-                json_string = json.dumps(json_)
-                self.specification = json.loads(json_string)
-            elif swagger_dict is not None:
-                self.specification = swagger_dict
+                stat = os.stat(swagger_path)
+                cache_path = os.path.abspath(swagger_path)
+                file_state = (stat.st_mtime_ns, stat.st_size)
+                cached = _SPECIFICATION_CACHE.get(cache_path)
+
+            if cached is not None and cached[0] == file_state:
+                # Already loaded and validated, copy it as callers may alter it
+                _SPECIFICATION_CACHE.move_to_end(cache_path)
+                self.specification = deepcopy(cached[1])
             else:
-                raise ValueError('You must specify a swagger_path or dict')
-            validate_spec(self.specification, '')
+                if swagger_path is not None:
+                    # Open yaml file
+                    arguments = {}
+                    with codecs.open(swagger_path, 'r', 'utf-8') as swagger_yaml:
+                        swagger_template = swagger_yaml.read()
+                        if any(marker in swagger_template for marker in _JINJA_MARKERS):
+                            swagger_string = jinja2.Template(swagger_template).render(**arguments)
+                        else:  # Nothing to render
+                            swagger_string = swagger_template
+                        self.specification = yaml.load(swagger_string, Loader=_YamlLoader)
+                elif swagger_yaml is not None:
+                    json_ = yaml.load(swagger_yaml, Loader=_YamlLoader)
+                    # The JSON round-trip turns non-string keys (eg unquoted status
+                    # codes) into strings, which validate_spec requires.
+                    json_string = json.dumps(json_)
+                    self.specification = json.loads(json_string)
+                elif swagger_dict is not None:
+                    self.specification = swagger_dict
+                else:
+                    raise ValueError('You must specify a swagger_path or dict')
+                validate_spec(self.specification, '')
+                if cache_path is not None:
+                    # Replaces any older version of the file
+                    _SPECIFICATION_CACHE.pop(cache_path, None)
+                    _SPECIFICATION_CACHE[cache_path] = (file_state, deepcopy(self.specification))
+                    if len(_SPECIFICATION_CACHE) > _SPECIFICATION_CACHE_SIZE:
+                        _SPECIFICATION_CACHE.popitem(last=False)
         except Exception as e:
             six.reraise(
                 ValueError,
@@ -77,8 +184,13 @@ class SwaggerParser(object):
         self.use_example = use_example
         self.base_path = self.specification.get('basePath', '')
         self.definitions_example = {}
-        self.build_definitions_example()
+        self._definition_constraints = {}
+        if not lazy_examples:
+            self.build_definitions_example()
         self.paths = {}
+        self._path_regexes = []
+        self._last_path_match = (None, None)
+        self._action_index = {}
         self.operation = {}
         self.generated_operation = {}
         self.get_paths_data()
@@ -97,32 +209,55 @@ class SwaggerParser(object):
         Returns:
             True if the example has been created, False if an error occured.
         """
-        if def_name in self.definitions_example.keys():  # Already processed
+        examples = self.definitions_example
+        if def_name in examples:  # Already processed
             return True
-        elif def_name not in self.specification['definitions'].keys():  # Def does not exist
+        def_spec = self.specification['definitions'].get(def_name)
+        if def_spec is None:  # Def does not exist
             return False
 
-        self.definitions_example[def_name] = {}
-        def_spec = self.specification['definitions'][def_name]
+        example = examples[def_name] = {}
 
         if def_spec.get('type') == 'array' and 'items' in def_spec:
             item = self.get_example_from_prop_spec(def_spec['items'])
-            self.definitions_example[def_name] = [item]
+            examples[def_name] = [item]
             return True
 
-        if 'properties' not in def_spec:
-            self.definitions_example[def_name] = self.get_example_from_prop_spec(def_spec)
+        properties = def_spec.get('properties')
+        if properties is None:
+            examples[def_name] = self.get_example_from_prop_spec(def_spec)
             return True
 
         # Get properties example value
-        for prop_name, prop_spec in def_spec['properties'].items():
-            example = self.get_example_from_prop_spec(prop_spec)
-            if example is None:
+        get_example_from_prop_spec = self.get_example_from_prop_spec
+        for prop_name, prop_spec in properties.items():
+            prop_example = get_example_from_prop_spec(prop_spec)
+            if prop_example is None:
                 return False
-            self.definitions_example[def_name][prop_name] = example
+            example[prop_name] = prop_example
 
         return True
 
+    def _get_definition_example(self, def_name):
+        """Get the example of the given definition, building it if needed.
+
+        Args:
+            def_name: Name of the definition.
+
+        Returns:
+            The example of the definition.
+        """
+        self.build_one_definition_example(def_name)
+        return self.definitions_example[def_name]
+
+    @staticmethod
+    def clear_specification_cache():
+        """Forget the swagger files already loaded and validated.
+
+        The next parser of each file reads and validates it again.
+        """
+        _SPECIFICATION_CACHE.clear()
+
     @staticmethod
     def check_type(value, type_def):
         """Check if the value is in the type given in type_def.
@@ -134,24 +269,7 @@ class SwaggerParser(object):
         Returns:
             True if the type is correct, False otherwise.
         """
-        if type_def == 'integer':
-            try:
-                # We accept string with integer ex: '123'
-                int(value)
-                return True
-            except ValueError:
-                return isinstance(value, six.integer_types) and not isinstance(value, bool)
-        elif type_def == 'number':
-            return isinstance(value, (six.integer_types, float)) and not isinstance(value, bool)
-        elif type_def == 'string':
-            return isinstance(value, (six.text_type, six.string_types, datetime.datetime))
-        elif type_def == 'boolean':
-            return (isinstance(value, bool) or
-                    (isinstance(value, (six.text_type, six.string_types,)) and
-                     value.lower() in ['true', 'false'])
-                    )
-        else:
-            return False
+        return _TYPE_CHECKERS.get(type_def, _check_unknown)(value)
 
     def get_example_from_prop_spec(self, prop_spec, from_allof=False):
         """Return an example value from a property specification.
@@ -165,18 +283,18 @@ class SwaggerParser(object):
             An example value
         """
         # Read example directly from (X-)Example or Default value
-        easy_keys = ['example', 'x-example', 'default']
-        for key in easy_keys:
-            if key in prop_spec.keys() and self.use_example:
-                return prop_spec[key]
+        if self.use_example:
+            for key in _EXAMPLE_KEYS:
+                if key in prop_spec:
+                    return prop_spec[key]
         # Enum
-        if 'enum' in prop_spec.keys():
+        if 'enum' in prop_spec:
             return prop_spec['enum'][0]
         # From definition
-        if '$ref' in prop_spec.keys():
+        if '$ref' in prop_spec:
             return self._example_from_definition(prop_spec)
         # Process AllOf section
-        if 'allOf' in prop_spec.keys():
+        if 'allOf' in prop_spec:
             return self._example_from_allof(prop_spec)
         # Complex type
         if 'type' not in prop_spec:
@@ -194,15 +312,15 @@ class SwaggerParser(object):
         if prop_spec['type'] == 'file':
             return (StringIO('my file contents'), 'hello world.txt')
         # Date time
-        if 'format' in prop_spec.keys() and prop_spec['format'] == 'date-time':
-            return self._get_example_from_basic_type('datetime')[0]
+        if prop_spec.get('format') == 'date-time':
+            return _BASIC_TYPE_EXAMPLES['datetime'][0]
         # List
         if isinstance(prop_spec['type'], list):
-            return self._get_example_from_basic_type(prop_spec['type'][0])[0]
+            return _BASIC_TYPE_EXAMPLES[prop_spec['type'][0]][0]
 
         # Default - basic type
         logging.info("falling back to basic type, no other match found")
-        return self._get_example_from_basic_type(prop_spec['type'])[0]
+        return _BASIC_TYPE_EXAMPLES[prop_spec['type']][0]
 
     def _get_example_from_properties(self, spec):
         """Get example from the properties of an object defined inline.
@@ -214,33 +332,27 @@ class SwaggerParser(object):
             An example for the given spec
             A boolean, whether we had additionalProperties in the spec, or not
         """
-        local_spec = deepcopy(spec)
+        properties = spec.get('properties')
+        required = spec.get('required')
 
         # Handle additionalProperties if they exist
-        # we replace additionalProperties with two concrete
-        # properties so that examples can be generated
-        additional_property = False
-        if 'additionalProperties' in local_spec:
-            additional_property = True
-            if 'properties' not in local_spec:
-                local_spec['properties'] = {}
-
-            if isinstance(local_spec['additionalProperties'], bool):
-                local_spec['additionalProperties'] = {}
-
-            local_spec['properties'].update({
-                'any_prop1': local_spec['additionalProperties'],
-                'any_prop2': local_spec['additionalProperties'],
-            })
-            del(local_spec['additionalProperties'])
-            required = local_spec.get('required', [])
-            required += ['any_prop1', 'any_prop2']
-            local_spec['required'] = required
+        # we add two concrete properties in their place so that examples can
+        # be generated (spec itself is left untouched)
+        additional_property = 'additionalProperties' in spec
+        if additional_property:
+            additional_properties = spec['additionalProperties']
+            if isinstance(additional_properties, bool):
+                additional_properties = {}
+
+            properties = dict(properties or {})
+            properties['any_prop1'] = additional_properties
+            properties['any_prop2'] = additional_properties
+            required = list(required or []) + ['any_prop1', 'any_prop2']
 
         example = {}
-        properties = local_spec.get('properties')
         if properties is not None:
-            required = local_spec.get('required', properties.keys())
+            if required is None:
+                required = properties
 
             for inner_name, inner_spec in properties.items():
                 if inner_name not in required:
@@ -265,18 +377,9 @@ class SwaggerParser(object):
         Returns:
             An array with two example values of the given type.
         """
-        if type == 'integer':
-            return [42, 24]
-        elif type == 'number':
-            return [5.5, 5.5]
-        elif type == 'string':
-            return ['string', 'string2']
-        elif type == 'datetime':
-            return ['2015-08-28T09:02:57.481Z', '2015-08-28T09:02:57.481Z']
-        elif type == 'boolean':
-            return [False, True]
-        elif type == 'null':
-            return ['null', 'null']
+        examples = _BASIC_TYPE_EXAMPLES.get(type)
+        if examples is not None:
+            return list(examples)
 
     @staticmethod
     def _definition_from_example(example):
@@ -349,8 +452,8 @@ class SwaggerParser(object):
             example_dict = self.definitions_example[definition_name]
             if not isinstance(example_dict, dict):
                 return example_dict
-            example = dict((example_name, example_value) for example_name, example_value in example_dict.items())
-            return example
+            # Shallow copy: the definition may still be under construction (self reference)
+            return example_dict.copy()
 
     def _example_from_complex_def(self, prop_spec):
         """Get an example from a property specification.
@@ -371,7 +474,7 @@ class SwaggerParser(object):
                 return self.definitions_example[definition_name]
         elif prop_spec['schema']['type'] == 'array':  # Array with definition
             # Get value from definition
-            if 'items' in prop_spec.keys():
+            if 'items' in prop_spec:
                 definition_name = self.get_definition_name_from_ref(prop_spec['items']['$ref'])
             else:
                 if '$ref' in prop_spec['schema']['items']:
@@ -379,7 +482,7 @@ class SwaggerParser(object):
                 else:
                     definition_name = self.get_definition_name_from_ref(prop_spec['schema']['items']['type'])
                     return [definition_name]
-            return [self.definitions_example[definition_name]]
+            return [self._get_definition_example(definition_name)]
         else:
             return self.get_example_from_prop_spec(prop_spec['schema'])
 
@@ -396,15 +499,15 @@ class SwaggerParser(object):
         if isinstance(prop_spec['items'], list):
             return [self.get_example_from_prop_spec(item_prop_spec) for item_prop_spec in prop_spec['items']]
         # Standard types in array
-        elif 'type' in prop_spec['items'].keys():
-            if 'format' in prop_spec['items'].keys() and prop_spec['items']['format'] == 'date-time':
+        elif 'type' in prop_spec['items']:
+            if 'format' in prop_spec['items'] and prop_spec['items']['format'] == 'date-time':
                 return self._get_example_from_basic_type('datetime')
             else:
                 return self._get_example_from_basic_type(prop_spec['items']['type'])
 
         # Array with definition
-        elif ('$ref' in prop_spec['items'].keys() or
-              ('schema' in prop_spec and '$ref' in prop_spec['schema']['items'].keys())):
+        elif ('$ref' in prop_spec['items'] or
+              ('schema' in prop_spec and '$ref' in prop_spec['schema']['items'])):
             # Get value from definition
             definition_name = self.get_definition_name_from_ref(prop_spec['items']['$ref']) or \
                 self.get_definition_name_from_ref(prop_spec['schema']['items']['$ref'])
@@ -413,17 +516,10 @@ class SwaggerParser(object):
                 if not isinstance(example_dict, dict):
                     return [example_dict]
                 if len(example_dict) == 1:
-                    try:  # Python 2.7
-                        res = example_dict[example_dict.keys()[0]]
-                    except TypeError:  # Python 3
-                        res = example_dict[list(example_dict)[0]]
-                    return res
+                    return next(iter(example_dict.values()))
 
                 else:
-                    return_value = {}
-                    for example_name, example_value in example_dict.items():
-                        return_value[example_name] = example_value
-                    return [return_value]
+                    return [example_dict.copy()]
         elif 'properties' in prop_spec['items']:
             prop_example = {}
             for prop_name, prop_spec in prop_spec['items']['properties'].items():
@@ -445,7 +541,13 @@ class SwaggerParser(object):
             If get_list is True, return a list of definition_name.
         """
         list_def_candidate = []
-        for definition_name in self.specification['definitions'].keys():
+        # Keys a matching definition must declare (null values are not checked)
+        keys_to_match = frozenset(key for key, value in dict.items() if value is not None)
+        for definition_name in self.specification['definitions']:
+            required, properties = self._get_definition_constraints(definition_name)
+            # Cheap pre-check on key sets before validating the values
+            if not (required.issubset(dict) and keys_to_match.issubset(properties)):
+                continue
             if self.validate_definition(definition_name, dict):
                 if not get_list:
                     return definition_name
@@ -473,7 +575,7 @@ class SwaggerParser(object):
 
         # the type of the value of the first key/value in valid_response is our
         # expected type - if it is a dict or list, we must go deeper
-        first_value = valid_response[list(valid_response)[0]]
+        first_value = next(iter(valid_response.values()))
 
         # dict
         if isinstance(first_value, dict):
@@ -496,12 +598,9 @@ class SwaggerParser(object):
 
         # simple types
         # all values must be of that type in both valid and actual response
-        try:
-            assert all(isinstance(y, type(first_value)) for _, y in response.items())
-            assert all(isinstance(y, type(first_value)) for _, y in valid_response.items())
-            return True
-        except Exception:
-            return False
+        expected_type = type(first_value)
+        return (all(isinstance(value, expected_type) for value in response.values()) and
+                all(isinstance(value, expected_type) for value in valid_response.values()))
 
     def validate_definition(self, definition_name, dict_to_test, definition=None):
         """Validate the given dict according to the given definition.
@@ -513,29 +612,48 @@ class SwaggerParser(object):
         Returns:
             True if the given dict match the definition, False otherwise.
         """
-        if (definition_name not in self.specification['definitions'].keys() and
-                definition is None):
-            # reject unknown definition
+        if definition is not None:
+            required = frozenset(definition.get('required', ()))
+            properties_dict = definition.get('properties', {})
+        elif definition_name in self.specification['definitions']:
+            required, properties_dict = self._get_definition_constraints(definition_name)
+        else:  # reject unknown definition
             return False
 
         # Check all required in dict_to_test
-        spec_def = definition or self.specification['definitions'][definition_name]
-        all_required_keys_present = all(req in dict_to_test.keys() for req in spec_def.get('required', {}))
-        if 'required' in spec_def and not all_required_keys_present:
+        if not required.issubset(dict_to_test):
             return False
 
         # Check no extra arg & type
-        properties_dict = spec_def.get('properties', {})
+        validate_type = self._validate_type
         for key, value in dict_to_test.items():
             if value is not None:
-                if key not in properties_dict:  # Extra arg
+                property_spec = properties_dict.get(key)
+                if property_spec is None:  # Extra arg
+                    return False
+                elif not validate_type(property_spec, value):  # Check type
                     return False
-                else:  # Check type
-                    if not self._validate_type(properties_dict[key], value):
-                        return False
 
         return True
 
+    def _get_definition_constraints(self, definition_name):
+        """Get the required keys and the properties of a definition.
+
+        They are computed once per definition and cached.
+
+        Args:
+            definition_name: name of the definition.
+
+        Returns:
+            A tuple with the frozenset of required keys and the properties dict.
+        """
+        constraints = self._definition_constraints.get(definition_name)
+        if constraints is None:
+            def_spec = self.specification['definitions'][definition_name]
+            constraints = (frozenset(def_spec.get('required', ())), def_spec.get('properties', {}))
+            self._definition_constraints[definition_name] = constraints
+        return constraints
+
     def _validate_type(self, properties_spec, value):
         """Validate the given value with the given property spec.
 
@@ -546,7 +664,7 @@ class SwaggerParser(object):
         Returns:
             True if the value is valid for the given spec.
         """
-        if 'type' not in properties_spec.keys():
+        if 'type' not in properties_spec:
             # Validate sub definition
             def_name = self.get_definition_name_from_ref(properties_spec['$ref'])
             return self.validate_definition(def_name, value)
@@ -556,15 +674,21 @@ class SwaggerParser(object):
             if not isinstance(value, list):
                 return False
 
+            items_spec = properties_spec['items']
+            item_type = items_spec.get('type')
             # Check type
-            if ('type' in properties_spec['items'].keys() and
-                    any(not self.check_type(item, properties_spec['items']['type']) for item in value)):
-                return False
+            if item_type is not None:
+                check_item = _TYPE_CHECKERS.get(item_type, _check_unknown)
+                for item in value:
+                    if not check_item(item):
+                        return False
             # Check ref
-            elif ('$ref' in properties_spec['items'].keys()):
-                def_name = self.get_definition_name_from_ref(properties_spec['items']['$ref'])
-                if any(not self.validate_definition(def_name, item) for item in value):
-                    return False
+            if '$ref' in items_spec:
+                def_name = self.get_definition_name_from_ref(items_spec['$ref'])
+                validate_definition = self.validate_definition
+                for item in value:
+                    if not validate_definition(def_name, item):
+                        return False
 
         else:  # Classic types
             if not self.check_type(value, properties_spec['type']):
@@ -577,45 +701,180 @@ class SwaggerParser(object):
 
         Get also the list of operationId.
         """
+        base_path = self.base_path
+        http_verbs = self._HTTP_VERBS
         for path, path_spec in self.specification['paths'].items():
-            path = u'{0}{1}'.format(self.base_path, path)
-            self.paths[path] = {}
+            path = base_path + path
+            path_methods = self.paths[path] = {}
 
             # Add path-level parameters
             default_parameters = {}
             if 'parameters' in path_spec:
                 self._add_parameters(default_parameters, path_spec['parameters'])
 
-            for http_method in path_spec.keys():
-                if http_method not in self._HTTP_VERBS:
+            for http_method in path_spec:
+                if http_method not in http_verbs:
                     continue
 
-                self.paths[path][http_method] = {}
-
                 # Add to operation list
                 action = path_spec[http_method]
-                tag = action['tags'][0] if 'tags' in action.keys() and action['tags'] else None
-                if 'operationId' in action.keys():
+                tag = action['tags'][0] if action.get('tags') else None
+                if 'operationId' in action:
                     self.operation[action['operationId']] = (path, http_method, tag)
                 else:
                     # Note: the encoding chosen below isn't very important in this
                     #       case; what matters is a byte string that is unique.
                     #       URL paths and http methods should encode to UTF-8 safely.
-                    h = hashlib.sha256()
-                    h.update(("{0}|{1}".format(http_method, path)).encode('utf-8'))
-                    self.generated_operation[h.hexdigest()] = (path, http_method, tag)
+                    operation_id = hashlib.sha256((http_method + '|' + path).encode('utf-8')).hexdigest()
+                    self.generated_operation[operation_id] = (path, http_method, tag)
 
-                # Get parameters
-                self.paths[path][http_method]['parameters'] = default_parameters.copy()
-                if 'parameters' in action.keys():
-                    self._add_parameters(self.paths[path][http_method]['parameters'], action['parameters'])
+                # Get parameters (path-level ones are shared when the action adds none)
+                if 'parameters' in action:
+                    parameters = default_parameters.copy()
+                    self._add_parameters(parameters, action['parameters'])
+                else:
+                    parameters = default_parameters
 
                 # Get responses
-                self.paths[path][http_method]['responses'] = action['responses']
+                method_spec = {'parameters': parameters, 'responses': action['responses']}
 
                 # Get mime types for this action
-                if 'consumes' in action.keys():
-                    self.paths[path][http_method]['consumes'] = action['consumes']
+                if 'consumes' in action:
+                    method_spec['consumes'] = action['consumes']
+                path_methods[http_method] = method_spec
+
+        # Compile the regex of each templated path once, in path order
+        # (literal paths are found by the exact lookup of get_path_spec)
+        self._path_regexes = [(path, self._get_path_regex(path)) for path in self.paths
+                              if _PATH_PARAMETER_RE.search(path)]
+        self._last_path_match = (None, None)
+        self._build_action_index()
+
+    def _build_action_index(self):
+        """Index the parameters of every action of self.paths by location.
+
+        The index is keyed by (path, http_method) so that request validation
+        does not have to scan and filter every parameter on each call.
+        """
+        self._action_index = {}
+        for path, path_spec in self.paths.items():
+            for http_method, action_spec in path_spec.items():
+                parameters = action_spec['parameters']
+                consumes = action_spec.get('consumes', [])
+                body_params = [(name, spec, self._get_body_definition_name(spec))
+                               for name, spec in parameters.items() if spec['in'] == 'body']
+                self._action_index[(path, http_method)] = _ActionIndex(
+                    body=body_params,
+                    required_body=frozenset(name for name, spec in parameters.items()
+                                            if spec['in'] == 'body' and spec.get('required')),
+                    required_query=frozenset(name for name, spec in parameters.items()
+                                             if spec['in'] == 'query' and spec.get('required')),
+                    text_accepted=any('text' in item for item in consumes),
+                    json_accepted=any('json' in item for item in consumes),
+                    body_example=self._get_body_example_source(body_params),
+                    responses=[(self._get_status_code_key(status_code), resp_spec)
+                               for status_code, resp_spec in action_spec.get('responses', {}).items()],
+                )
+
+    @staticmethod
+    def _get_status_code_key(status_code):
+        """Get the key of a status code in get_request_data responses.
+
+        Args:
+            status_code: status code as written in the specification.
+
+        Returns:
+            The status code as an int, or unchanged if it is not a number (default).
+        """
+        try:
+            return int(status_code)
+        except ValueError:
+            return status_code
+
+    def _get_body_definition_name(self, param_spec):
+        """Get the name of the definition a body parameter refers to.
+
+        Args:
+            param_spec: specification of the body parameter.
+
+        Returns:
+            The definition name of the schema (or of its items for an array),
+            None if the parameter does not refer to a definition.
+        """
+        schema = param_spec.get('schema')
+        if schema is None:
+            return None
+        if schema.get('type') == 'array':
+            schema = schema.get('items', {})
+        if '$ref' not in schema:
+            return None
+        return self.get_definition_name_from_ref(schema['$ref'])
+
+    def _get_body_example_source(self, body_params):
+        """Resolve once how to build an example body for the given body parameters.
+
+        Args:
+            body_params: list of (name, spec, definition_name) of the body
+                         parameters of an action (see _build_action_index).
+
+        Returns:
+            A (kind, arg) tuple to give to _build_body_example, or None if the
+            action has no body parameter.
+        """
+        for name, spec, definition_name in body_params:
+            if 'type' in spec:
+                # Get value from type
+                return ('prop_spec', spec)
+            elif 'schema' in spec:
+                schema = spec['schema']
+                schema_type = schema.get('type')
+                if schema_type == 'array':
+                    # It is an array
+                    # Get value from definition
+                    if definition_name is not None:
+                        return ('definition_array', definition_name)
+                    else:
+                        return ('item_type_array', schema.get('items', {}))
+                elif schema_type is not None:
+                    # Type but not array
+                    return ('prop_spec', schema)
+                else:
+                    # Get value from definition
+                    return ('definition', definition_name)
+        return None
+
+    def _build_body_example(self, kind, arg):
+        """Build an example body from a source given by _get_body_example_source.
+
+        Args:
+            kind: kind of the source ('prop_spec', 'definition',
+                  'definition_array' or 'item_type_array').
+            arg: property spec, definition name or items spec of the source.
+
+        Returns:
+            A correct body example.
+        """
+        if kind == 'prop_spec':
+            return self.get_example_from_prop_spec(arg)
+        elif kind == 'definition':
+            return self._get_definition_example(arg)
+        elif kind == 'definition_array':
+            return [self._get_definition_example(arg)]
+        else:  # item_type_array
+            return [self.get_definition_name_from_ref(arg['type'])]
+
+    @staticmethod
+    def _get_path_regex(path):
+        """Get a compiled regex matching the given path template.
+
+        Args:
+            path: path template (ex: "/v2/pets/{petId}").
+
+        Returns:
+            A compiled regex where every path parameter matches one path segment.
+        """
+        parts = _PATH_PARAMETER_RE.split(path)
+        return re.compile('([^/]*)'.join(re.escape(part) for part in parts) + r'$')
 
     def _add_parameters(self, parameter_map, parameter_list):
         """Populates the given parameter map with the list of parameters provided, resolving any reference objects encountered.
@@ -640,9 +899,7 @@ class SwaggerParser(object):
         Returns:
             The definition name corresponding to the ref.
         """
-        p = re.compile('#/definitions/(.*)')
-        definition_name = re.sub(p, r'\1', ref)
-        return definition_name
+        return _get_definition_name(ref)
 
     def get_path_spec(self, path, action=None):
         """Get the specification matching with the given path.
@@ -658,22 +915,27 @@ class SwaggerParser(object):
         # Get the specification of the given path
         path_spec = None
         path_name = None
-        for base_path in self.paths.keys():
-            if path == base_path:
-                path_spec = self.paths[base_path]
-                path_name = base_path
+        if path in self.paths:
+            path_spec = self.paths[path]
+            path_name = path
 
-        # Path parameter
+        # Path parameter (the last templated match is remembered, as callers
+        # usually look up the same path several times in a row)
         if path_spec is None:
-            for base_path in self.paths.keys():
-                regex_from_path = re.compile(re.sub('{[^/]*}', '([^/]*)', base_path) + r'$')
-                if re.match(regex_from_path, path):
-                    path_spec = self.paths[base_path]
-                    path_name = base_path
+            last_path, last_path_name = self._last_path_match
+            if path == last_path:
+                path_name = last_path_name
+            else:
+                for base_path, regex_from_path in self._path_regexes:
+                    if regex_from_path.match(path):
+                        path_name = base_path
+                self._last_path_match = (path, path_name)
+            if path_name is not None:
+                path_spec = self.paths[path_name]
 
         # Test action if given
         if path_spec is not None and action is not None:
-            if action not in path_spec.keys():
+            if action not in path_spec:
                 return (None, None)
             else:
                 path_spec = path_spec[action]
@@ -716,15 +978,16 @@ class SwaggerParser(object):
             logging.warn("there is no path")
             return False
 
-        if action not in path_spec.keys():  # reject unknown http method
+        if action not in path_spec:  # reject unknown http method
             logging.warn("this http method is unknown '{0}'".format(action))
             return False
 
         action_spec = path_spec[action]
+        action_index = self._action_index[(path_name, action)]
 
         # check general post body guidelines (body + mime type)
         if action == 'post':
-            is_ok, msg = _validate_post_body(body, action_spec)
+            is_ok, msg = _validate_post_body(body, action_spec, action_index)
             if not is_ok:
                 logging.warn("the general post body did not validate due to '{0}'".format(msg))
                 return False
@@ -736,92 +999,96 @@ class SwaggerParser(object):
             return True
 
         # Check body parameters
-        is_ok, msg = self._validate_body_parameters(body, action_spec)
+        is_ok, msg = self._validate_body_parameters(body, action_index)
         if not is_ok:
             logging.warn("the parameters in the body did not validate due to '{0}'".format(msg))
             return False
 
         # Check query parameters
-        if query is not None and not self._validate_query_parameters(query, action_spec):
+        if query is not None and not self._validate_query_parameters(query, action_spec, action_index):
             return False
 
         return True
 
-    def _validate_query_parameters(self, query, action_spec):
+    def _validate_query_parameters(self, query, action_spec, action_index):
         """Check the query parameter for the action specification.
 
         Args:
             query: query parameter to check.
             action_spec: specification of the action.
+            action_index: _ActionIndex of the action (see _build_action_index).
 
         Returns:
             True if the query is valid.
         """
-        processed_params = []
+        parameters = action_spec['parameters']
+        check_type = self.check_type
+        processed_params = set()
         for param_name, param_value in query.items():
-            if param_name in action_spec['parameters'].keys():
-                processed_params.append(param_name)
+            param_spec = parameters.get(param_name)
+            if param_spec is not None:
+                processed_params.add(param_name)
 
                 # Check array
-                if action_spec['parameters'][param_name]['type'] == 'array':
+                if param_spec['type'] == 'array':
                     if not isinstance(param_value, list):  # Not an array
                         return False
                     else:
+                        check_item = _TYPE_CHECKERS.get(param_spec['items']['type'], _check_unknown)
                         for i in param_value:  # Check type of all elements in array
-                            if not self.check_type(i, action_spec['parameters'][param_name]['items']['type']):
+                            if not check_item(i):
                                 return False
 
-                elif not self.check_type(param_value, action_spec['parameters'][param_name]['type']):
+                elif not check_type(param_value, param_spec['type']):
                     return False
 
         # Check required
-        if not all(param in processed_params for param, spec in action_spec['parameters'].items()
-                   if spec['in'] == 'query' and 'required' in spec and spec['required']):
+        if not action_index.required_query <= processed_params:
             return False
         return True
 
-    def _validate_body_parameters(self, body, action_spec):
+    def _validate_body_parameters(self, body, action_index):
         """Check the body parameter for the action specification.
 
         Args:
             body: body parameter to check.
-            action_spec: specification of the action.
+            action_index: _ActionIndex of the action (see _build_action_index).
 
         Returns:
             True if the body is valid.
             A string containing an error msg in case the body did not validate,
             otherwise the string is empty
         """
-        processed_params = []
-        for param_name, param_spec in action_spec['parameters'].items():
-            if param_spec['in'] == 'body':
-                processed_params.append(param_name)
-
-                # Check type
-                if 'type' in param_spec.keys() and not self.check_type(body, param_spec['type']):
-                    msg = "Check type did not validate for {0} and {1}".format(param_spec['type'], body)
-                    return False, msg
-                # Check schema
-                elif 'schema' in param_spec.keys():
-                    if 'type' in param_spec['schema'].keys() and param_spec['schema']['type'] == 'array':
-                        # It is an array get value from definition
-                        definition_name = self.get_definition_name_from_ref(param_spec['schema']['items']['$ref'])
-                        if len(body) > 0 and not self.validate_definition(definition_name, body[0]):
-                            msg = "The body did not validate against its definition"
-                            return False, msg
-                    elif ('type' in param_spec['schema'].keys() and not
-                          self.check_type(body, param_spec['schema']['type'])):
-                        # Type but not array
-                        msg = "Check type did not validate for {0} and {1}".format(param_spec['schema']['type'], body)
+        check_type = self.check_type
+        validate_definition = self.validate_definition
+        processed_params = set()
+        for param_name, param_spec, definition_name in action_index.body:
+            processed_params.add(param_name)
+
+            # Check type
+            if 'type' in param_spec and not check_type(body, param_spec['type']):
+                msg = "Check type did not validate for {0} and {1}".format(param_spec['type'], body)
+                return False, msg
+            # Check schema
+            elif 'schema' in param_spec:
+                schema = param_spec['schema']
+                schema_type = schema.get('type')
+                if schema_type == 'array':
+                    # It is an array get value from definition
+                    if len(body) > 0 and not validate_definition(definition_name, body[0]):
+                        msg = "The body did not validate against its definition"
+                        return False, msg
+                elif schema_type is not None:
+                    # Type but not array
+                    if not check_type(body, schema_type):
+                        msg = "Check type did not validate for {0} and {1}".format(schema_type, body)
+                        return False, msg
+                else:
+                    if not validate_definition(definition_name, body):
+                        msg = "The body did not validate against its definition"
                         return False, msg
-                    else:
-                        definition_name = self.get_definition_name_from_ref(param_spec['schema']['$ref'])
-                        if not self.validate_definition(definition_name, body):
-                            msg = "The body did not validate against its definition"
-                            return False, msg
         # Check required
-        if not all(param in processed_params for param, spec in action_spec['parameters'].items()
-                   if spec['in'] == 'body' and 'required' in spec and spec['required']):
+        if not action_index.required_body <= processed_params:
             msg = "Not all required parameters were present"
             return False, msg
 
@@ -831,23 +1098,25 @@ class SwaggerParser(object):
         """Get a response example from a response spec.
 
         """
-        if 'schema' in resp_spec.keys():
-            if '$ref' in resp_spec['schema']:  # Standard definition
-                definition_name = self.get_definition_name_from_ref(resp_spec['schema']['$ref'])
-                return self.definitions_example[definition_name]
-            elif 'items' in resp_spec['schema'] and resp_spec['schema']['type'] == 'array':  # Array
-                if '$ref' in resp_spec['schema']['items']:
-                    definition_name = self.get_definition_name_from_ref(resp_spec['schema']['items']['$ref'])
+        schema = resp_spec.get('schema')
+        if schema is not None:
+            if '$ref' in schema:  # Standard definition
+                definition_name = self.get_definition_name_from_ref(schema['$ref'])
+                return self._get_definition_example(definition_name)
+            elif 'items' in schema and schema['type'] == 'array':  # Array
+                items = schema['items']
+                if '$ref' in items:
+                    definition_name = self.get_definition_name_from_ref(items['$ref'])
                 else:
-                    if 'type' in resp_spec['schema']['items']:
-                        definition_name = self.get_definition_name_from_ref(resp_spec['schema']['items'])
+                    if 'type' in items:
+                        definition_name = self.get_definition_name_from_ref(items)
                         return [definition_name]
                     else:
-                        logging.warn("No item type in: " + resp_spec['schema'])
+                        logging.warn("No item type in: " + schema)
                         return ''
-                return [self.definitions_example[definition_name]]
-            elif 'type' in resp_spec['schema']:
-                return self.get_example_from_prop_spec(resp_spec['schema'])
+                return [self._get_definition_example(definition_name)]
+            elif 'type' in schema:
+                return self.get_example_from_prop_spec(schema)
         else:
             return ''
 
@@ -865,20 +1134,17 @@ class SwaggerParser(object):
         """
         body = body or ''
         path_name, path_spec = self.get_path_spec(path)
-        response = {}
+        if path_spec is None or action not in path_spec:
+            return dict(_DEFAULT_RESPONSE)
 
-        # Get all status code
-        if path_spec is not None and action in path_spec.keys():
-            for status_code in path_spec[action]['responses'].keys():
-                resp = path_spec[action]['responses'][status_code]
-                try:
-                    response[int(status_code)] = self.get_response_example(resp)
-                except ValueError:
-                    response[status_code] = self.get_response_example(resp)
+        # Get all status code (examples are built on each call as callers may alter them)
+        get_response_example = self.get_response_example
+        response = {key: get_response_example(resp_spec)
+                    for key, resp_spec in self._action_index[(path_name, action)].responses}
 
         # If there is no status_code add a default 400
-        if response == {}:
-            response[400] = ''
+        if not response:
+            return dict(_DEFAULT_RESPONSE)
         return response
 
     def get_send_request_correct_body(self, path, action):
@@ -894,38 +1160,20 @@ class SwaggerParser(object):
         """
         path_name, path_spec = self.get_path_spec(path)
 
-        if path_spec is not None and action in path_spec.keys():
-            for name, spec in path_spec[action]['parameters'].items():
-                if spec['in'] == 'body':  # Get body parameter
-                    if 'type' in spec.keys():
-                        # Get value from type
-                        return self.get_example_from_prop_spec(spec)
-                    elif 'schema' in spec.keys():
-                        if 'type' in spec['schema'].keys() and spec['schema']['type'] == 'array':
-                            # It is an array
-                            # Get value from definition
-                            if '$ref' in spec['schema']['items']:
-                                definition_name = self.get_definition_name_from_ref(spec['schema']
-                                                                                    ['items']['$ref'])
-                                return [self.definitions_example[definition_name]]
-                            else:
-                                definition_name = self.get_definition_name_from_ref(spec['schema']
-                                                                                    ['items']['type'])
-                                return [definition_name]
-                        elif 'type' in spec['schema'].keys():
-                            # Type but not array
-                            return self.get_example_from_prop_spec(spec['schema'])
-                        else:
-                            # Get value from definition
-                            definition_name = self.get_definition_name_from_ref(spec['schema']['$ref'])
-                            return self.definitions_example[definition_name]
-
-
-def _validate_post_body(actual_request_body, body_specification):
+        if path_spec is not None and action in path_spec:
+            body_example = self._action_index[(path_name, action)].body_example
+            if body_example is not None:
+                return self._build_body_example(*body_example)
+
+
+def _validate_post_body(actual_request_body, body_specification, action_index):
     """ returns a tuple (boolean, msg)
         to indicate whether the validation passed
         if False then msg contains the reason
         if True then msg is empty
+
+        the accepted mime types are read from the action_index built
+        by SwaggerParser._build_action_index
     """
 
     # If no body specified, return True (POST with empty body is allowed):
@@ -942,8 +1190,8 @@ def _validate_post_body(actual_request_body, body_specification):
         return False, msg
 
     # What is the mime type ?
-    text_is_accepted = any('text' in item for item in body_specification.get('consumes', []))
-    json_is_accepted = any('json' in item for item in body_specification.get('consumes', []))
+    text_is_accepted = action_index.text_accepted
+    json_is_accepted = action_index.json_accepted
 
     if actual_request_body == '' and not text_is_accepted:
         msg = "post body is an empty string, but text is not an accepted mime type"
@@ -958,11 +1206,11 @@ def _validate_post_body(actual_request_body, body_specification):
     # that string, though)
     if (json_is_accepted and not
             text_is_accepted and
-            type(actual_request_body).__name__ == 'str'):
+            isinstance(actual_request_body, six.string_types)):
         actual_request_body = json.loads(actual_request_body)
 
     # Handle empty body
-    body_is_empty = actual_request_body in [None, '', {}]
+    body_is_empty = actual_request_body is None or actual_request_body == '' or actual_request_body == {}
     if body_is_empty:
         if parameters_required:
             msg = "there is no body, but it says there are required parameters"
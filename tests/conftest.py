@@ -6,12 +6,14 @@ import pytest
 from swagger_parser import SwaggerParser
 
 
-@pytest.fixture
+# Parsers are shared by the whole session: tests must not modify them
+# (build a new SwaggerParser in the test instead)
+@pytest.fixture(scope="session")
 def swagger_parser():
     return SwaggerParser(os.path.join(os.path.dirname(__file__), 'files', 'swagger.yaml'))
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def swagger_allof_parser():
     return SwaggerParser(os.path.join(os.path.dirname(__file__), 'files', 'allof.yaml'))
 
@@ -21,24 +23,11 @@ def swagger_test2_parser():
     return SwaggerParser(os.path.join(os.path.dirname(__file__), 'files', 'test.yaml'))
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def inline_parser():
     return SwaggerParser(os.path.join(os.path.dirname(__file__), 'files', 'inline.yaml'))
 
 
-@pytest.fixture(scope="module",
-                params=[os.path.join(os.path.dirname(__file__), 'files', 'no_properties.yaml'),
-                        os.path.join(os.path.dirname(__file__), 'files', 'object_no_schema.yaml'),
-                        os.path.join(os.path.dirname(__file__), 'files', 'allof.yaml'),
-                        os.path.join(os.path.dirname(__file__), 'files', 'array_ref_simple.yaml'),
-                        os.path.join(os.path.dirname(__file__), 'files', 'null_type.yaml'),
-                        os.path.join(os.path.dirname(__file__), 'files', 'array_items_list.yaml'),
-                        os.path.join(os.path.dirname(__file__), 'files', 'type_list.yaml'),
-                        ])
-def swagger_file_parser(request):
-    return SwaggerParser(request.param)
-
-
 @pytest.fixture
 def pet_definition_example():
     return {
@@ -1,23 +1,38 @@
 # -*- coding:utf-8 -*-
 
+import codecs
+import json
+import os
+import pickle
 import pytest
-import requests
 
 from copy import deepcopy
 
 from swagger_parser import SwaggerParser
+from swagger_parser.swagger_parser import _SPECIFICATION_CACHE_SIZE
+
+
+def _get_petstore_swagger(extension):
+    """Download the text of the petstore swagger file in the given format (json or yaml)."""
+    import requests  # only needed by the slow petstore tests
+
+    response = requests.get("http://petstore.swagger.io/v2/swagger." + extension, timeout=10)
+    response.raise_for_status()
+    return response.text
 
 
 # whatever is defined in the petstore, we should be able to parse the json
+@pytest.mark.slow
 def test_validate_petstore_swagger_json():
-    complete_json = requests.get("http://petstore.swagger.io/v2/swagger.json").json()
+    complete_json = json.loads(_get_petstore_swagger('json'))
     SwaggerParser(swagger_dict=complete_json, use_example=True)
     SwaggerParser(swagger_dict=complete_json, use_example=False)
 
 
 # whatever is defined in the petstore, we should be able to parse the yaml
+@pytest.mark.slow
 def test_validate_petstore_swagger_yaml():
-    complete_yaml = requests.get("http://petstore.swagger.io/v2/swagger.yaml").text
+    complete_yaml = _get_petstore_swagger('yaml')
     SwaggerParser(swagger_yaml=complete_yaml, use_example=True)
     SwaggerParser(swagger_yaml=complete_yaml, use_example=False)
 
@@ -26,177 +41,238 @@ def test_inline_examples(inline_parser, inline_example):
     assert inline_parser.generated_operation == inline_example
 
 
-def test_swagger_file_parser(swagger_file_parser):
-    assert swagger_file_parser
+@pytest.mark.parametrize('swagger_file', [
+    'no_properties.yaml',
+    'object_no_schema.yaml',
+    'allof.yaml',
+    'array_ref_simple.yaml',
+    'null_type.yaml',
+    'array_items_list.yaml',
+    'type_list.yaml',
+    'array_body_untyped_items.yaml',
+])
+def test_swagger_file_parser(swagger_file):
+    assert SwaggerParser(os.path.join(os.path.dirname(__file__), 'files', swagger_file))
+
+
+def test_specification_cache():
+    swagger_path = os.path.join(os.path.dirname(__file__), 'files', 'swagger.yaml')
+    first_parser = SwaggerParser(swagger_path)
+    first_parser.specification['definitions']['Pet']['properties']['category']['$ref'] = '#/definitions/Error'
+
+    # A second parser of the same file gets its own, unaltered, copy
+    second_parser = SwaggerParser(swagger_path)
+    assert second_parser.specification is not first_parser.specification
+    assert second_parser.specification['definitions']['Pet']['properties']['category']['$ref'] == \
+        '#/definitions/Category'
+
+
+def _write_swagger_copy(path, title):
+    """Write a copy of swagger.yaml with the given title to path."""
+    with codecs.open(os.path.join(os.path.dirname(__file__), 'files', 'swagger.yaml'), 'r', 'utf-8') as swagger_file:
+        path.write_text(swagger_file.read().replace('Swagger Petstore', title), 'utf-8')
+
+
+def _rewrite_in_place(path, title):
+    """Change the title of a swagger copy (to one of the same length) keeping its mtime."""
+    stat = os.stat(str(path))
+    _write_swagger_copy(path, title)
+    os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def test_specification_cache_reloads_edited_file(tmpdir):
+    swagger_path = tmpdir.join('swagger.yaml')
+    _write_swagger_copy(swagger_path, 'Swagger Petstore')
+    assert SwaggerParser(str(swagger_path)).specification['info']['title'] == 'Swagger Petstore'
+
+    _write_swagger_copy(swagger_path, 'Edited Petstore')
+    swagger_path.setmtime(swagger_path.mtime() + 10)
+    assert SwaggerParser(str(swagger_path)).specification['info']['title'] == 'Edited Petstore'
+
+
+def test_clear_specification_cache(tmpdir):
+    swagger_path = tmpdir.join('swagger.yaml')
+    _write_swagger_copy(swagger_path, 'Swagger Petstore')
+    SwaggerParser(str(swagger_path))
+
+    # An unchanged size and mtime is served from the cache until it is cleared
+    _rewrite_in_place(swagger_path, 'Changed Petstore')
+    assert SwaggerParser(str(swagger_path)).specification['info']['title'] == 'Swagger Petstore'
+    SwaggerParser.clear_specification_cache()
+    assert SwaggerParser(str(swagger_path)).specification['info']['title'] == 'Changed Petstore'
 
 
-def test_build_definitions_example(swagger_parser, pet_definition_example):
+def test_specification_cache_is_bounded(tmpdir):
+    first_path = tmpdir.join('swagger0.yaml')
+    _write_swagger_copy(first_path, 'Swagger Petstore')
+    SwaggerParser(str(first_path))
+    _rewrite_in_place(first_path, 'Changed Petstore')
+
+    # Loading enough other files evicts the first one
+    for index in range(1, _SPECIFICATION_CACHE_SIZE + 1):
+        swagger_path = tmpdir.join('swagger{0}.yaml'.format(index))
+        _write_swagger_copy(swagger_path, 'Swagger Petstore')
+        SwaggerParser(str(swagger_path))
+    assert SwaggerParser(str(first_path)).specification['info']['title'] == 'Changed Petstore'
+
+
+def test_build_definitions_example(pet_definition_example):
+    # This test alters the parser, so it does not use the shared fixture
+    parser = SwaggerParser(os.path.join(os.path.dirname(__file__), 'files', 'swagger.yaml'))
+
     # Test definitions_example
-    swagger_parser.build_definitions_example()
-    assert len(swagger_parser.definitions_example) == 5
-    assert swagger_parser.definitions_example['Pet'] == pet_definition_example
+    parser.build_definitions_example()
+    assert len(parser.definitions_example) == 5
+    assert parser.definitions_example['Pet'] == pet_definition_example
 
     # Test wrong definition
-    swagger_parser.specification['definitions']['Pet']['properties']['category']['$ref'] = '#/definitions/Error'
-    del swagger_parser.definitions_example['Pet']
-    assert not swagger_parser.build_one_definition_example('Pet')
+    parser.specification['definitions']['Pet']['properties']['category']['$ref'] = '#/definitions/Error'
+    del parser.definitions_example['Pet']
+    assert not parser.build_one_definition_example('Pet')
 
     # Test wrong def name
-    assert not swagger_parser.build_one_definition_example('Error')
+    assert not parser.build_one_definition_example('Error')
 
 
-def test_check_type(swagger_parser):
+@pytest.mark.parametrize('value,type_def,expected', [
     # Test int
-    assert swagger_parser.check_type(int(5), 'integer')
-    assert swagger_parser.check_type(int(5), 'number')
-    assert swagger_parser.check_type('5', 'integer')
-    assert not swagger_parser.check_type(int(5), 'string')
-    assert not swagger_parser.check_type(int(5), 'boolean')
-
+    (5, 'integer', True),
+    (5, 'number', True),
+    ('5', 'integer', True),
+    (5, 'string', False),
+    (5, 'boolean', False),
     # Test float
-    assert swagger_parser.check_type(5.5, 'number')
-    assert not swagger_parser.check_type(5.5, 'string')
-    assert not swagger_parser.check_type(5.5, 'boolean')
-
+    (5.5, 'number', True),
+    (5.5, 'string', False),
+    (5.5, 'boolean', False),
+    (5.5, 'integer', False),
     # Test string
-    assert not swagger_parser.check_type('test', 'integer')
-    assert not swagger_parser.check_type('test', 'number')
-    assert swagger_parser.check_type('test', 'string')
-    assert not swagger_parser.check_type('test', 'boolean')
-
+    ('test', 'integer', False),
+    ('test', 'number', False),
+    ('test', 'string', True),
+    ('test', 'boolean', False),
     # Test boolean
-    assert not swagger_parser.check_type(False, 'number')
-    assert not swagger_parser.check_type(False, 'string')
-    assert swagger_parser.check_type(False, 'boolean')
-
+    (False, 'number', False),
+    (True, 'integer', False),
+    (False, 'string', False),
+    (False, 'boolean', True),
     # Test other
-    assert not swagger_parser.check_type(swagger_parser, 'string')
+    (object(), 'string', False),
+    (None, 'integer', False),
+])
+def test_check_type(swagger_parser, value, type_def, expected):
+    assert swagger_parser.check_type(value, type_def) is expected
 
 
-def test_get_example_from_prop_spec(swagger_parser):
-    prop_spec = {}
-
-    # Primitive types
-    prop_spec['type'] = 'integer'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == 42
-    prop_spec['type'] = 'number'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == 5.5
-    prop_spec['type'] = 'string'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == 'string'
-    prop_spec['type'] = 'boolean'
-    assert not swagger_parser.get_example_from_prop_spec(prop_spec)
-
-    # Array
-    prop_spec['type'] = 'array'
-    prop_spec['items'] = {}
-
+@pytest.mark.parametrize('prop_spec,expected', [
     # Primitive types
-    prop_spec['items']['type'] = 'integer'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == [42, 24]
-    prop_spec['items']['type'] = 'number'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == [5.5, 5.5]
-    prop_spec['items']['type'] = 'string'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == ['string', 'string2']
-    prop_spec['items']['type'] = 'boolean'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == [False, True]
-
-    # definition
-    del prop_spec['items']['type']
-    prop_spec['items']['$ref'] = '#/definitions/Tag'
-    assert swagger_parser.get_example_from_prop_spec(prop_spec) == [{'id': 42, 'name': 'string'}]
-
+    ({'type': 'integer'}, 42),
+    ({'type': 'number'}, 5.5),
+    ({'type': 'string'}, 'string'),
+    ({'type': 'boolean'}, False),
+    # Array of primitive types
+    ({'type': 'array', 'items': {'type': 'integer'}}, [42, 24]),
+    ({'type': 'array', 'items': {'type': 'number'}}, [5.5, 5.5]),
+    ({'type': 'array', 'items': {'type': 'string'}}, ['string', 'string2']),
+    ({'type': 'array', 'items': {'type': 'boolean'}}, [False, True]),
+    # Array of definition
+    ({'type': 'array', 'items': {'$ref': '#/definitions/Tag'}}, [{'id': 42, 'name': 'string'}]),
     # Inline complex
-    prop_spec = {
-      'type': 'object',
-      'properties': {
-        'error': {
-          'type': 'object',
-          'properties': {
-            'code': {'type': 'string'},
-            'title': {'type': 'string'},
-            'detail': {'type': 'string'},
-          },
-          'required': ['code', 'title', 'detail'],
-        },
-      },
-      'required': ['error'],
-    }
-    example = swagger_parser.get_example_from_prop_spec(prop_spec)
-    assert example == [{'error': {'code': 'string', 'detail': 'string', 'title': 'string'}}]
-
-
-def test_get_example_from_prop_spec_with_additional_properties(swagger_parser):
-    prop_spec = {
-      'type': 'object',
-      'properties': {
-        'error': {
-          'type': 'object',
-          'properties': {
-            'code': {'type': 'string'},
-            'title': {'type': 'string'},
-            'detail': {'type': 'string'},
-          },
-          'required': ['code', 'title', 'detail'],
+    ({
+        'type': 'object',
+        'properties': {
+            'error': {
+                'type': 'object',
+                'properties': {
+                    'code': {'type': 'string'},
+                    'title': {'type': 'string'},
+                    'detail': {'type': 'string'},
+                },
+                'required': ['code', 'title', 'detail'],
+            },
         },
-      },
-      'required': ['error'],
-    }
-
-    # additionalProperties - $ref (complex prop_spec with required keys)
-    prop_spec['additionalProperties'] = {'$ref': '#/definitions/Category'}
-    example = swagger_parser.get_example_from_prop_spec(prop_spec)
-    assert example == {
+        'required': ['error'],
+    }, [{'error': {'code': 'string', 'detail': 'string', 'title': 'string'}}]),
+])
+def test_get_example_from_prop_spec(swagger_parser, prop_spec, expected):
+    assert swagger_parser.get_example_from_prop_spec(prop_spec) == expected
+
+
+# Object property shared by the additionalProperties test specs
+_ERROR_PROPERTY = {
+    'type': 'object',
+    'properties': {
+        'code': {'type': 'string'},
+        'title': {'type': 'string'},
+        'detail': {'type': 'string'},
+    },
+    'required': ['code', 'title', 'detail'],
+}
+
+
+@pytest.mark.parametrize('prop_spec,expected', [
+    # $ref (complex prop_spec with required keys)
+    ({
+        'type': 'object',
+        'properties': {'error': _ERROR_PROPERTY},
+        'required': ['error'],
+        'additionalProperties': {'$ref': '#/definitions/Category'},
+    }, {
         'any_prop2': {'id': 42, 'name': 'string'},
         'any_prop1': {'id': 42, 'name': 'string'},
         'error': {'code': 'string', 'detail': 'string', 'title': 'string'},
-    }
-
-    # additionalProperties - string (with complex prop_spec without required keys)
-    del prop_spec['required']
-    prop_spec['additionalProperties'] = {'type': 'string'}
-    example = swagger_parser.get_example_from_prop_spec(prop_spec)
-    assert example == {
+    }),
+    # string (with complex prop_spec without required keys)
+    ({
+        'type': 'object',
+        'properties': {'error': _ERROR_PROPERTY},
+        'additionalProperties': {'type': 'string'},
+    }, {
         'any_prop2': 'string',
         'any_prop1': 'string',
-    }
-
-    # additionalProperties - integer (prop spec with only additional properties)
-    easy_prop_spec = {
+    }),
+    # integer (prop spec with only additional properties)
+    ({
         'type': 'object',
         'additionalProperties': {'type': 'integer', 'format': 'int64'},
-    }
-    example = swagger_parser.get_example_from_prop_spec(easy_prop_spec)
-    assert example == {'any_prop1': 42, 'any_prop2': 42}
-
-    # additionalProperties - dict not satisfying any definition
-    #  (with complex prop_spec without required keys)
-    prop_spec['additionalProperties'] = {
+    }, {'any_prop1': 42, 'any_prop2': 42}),
+    # dict not satisfying any definition (with complex prop_spec without required keys)
+    ({
         'type': 'object',
-        'properties': {
-            'food': {'type': 'string'},
-            'drink': {'type': 'number', 'format': 'double'},
-            'movies': {'type': 'boolean'},
-        }
-    }
-    example = swagger_parser.get_example_from_prop_spec(prop_spec)
-    assert example == {
+        'properties': {'error': _ERROR_PROPERTY},
+        'additionalProperties': {
+            'type': 'object',
+            'properties': {
+                'food': {'type': 'string'},
+                'drink': {'type': 'number', 'format': 'double'},
+                'movies': {'type': 'boolean'},
+            },
+        },
+    }, {
         'any_prop2': {'food': 'string', 'movies': False, 'drink': 5.5},
         'any_prop1': {'food': 'string', 'movies': False, 'drink': 5.5},
-    }
-
-    # additionalProperties - dict satisfying the 'Category' definition
-    prop_spec['additionalProperties'] = {
+    }),
+    # dict satisfying the 'Category' definition
+    ({
         'type': 'object',
-        'properties': {
-            'id': {'type': 'integer', 'format': 'int64'},
-            'name': {'type': 'string'},
-        }
-    }
-    example = swagger_parser.get_example_from_prop_spec(prop_spec)
-    assert example == {
+        'properties': {'error': _ERROR_PROPERTY},
+        'additionalProperties': {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer', 'format': 'int64'},
+                'name': {'type': 'string'},
+            },
+        },
+    }, {
         'any_prop2': {'id': 42, 'name': 'string'},
         'any_prop1': {'id': 42, 'name': 'string'},
-    }
+    }),
+], ids=['ref', 'string', 'integer', 'object', 'category_object'])
+def test_get_example_from_prop_spec_with_additional_properties(swagger_parser, prop_spec, expected):
+    original_prop_spec = deepcopy(prop_spec)
+    assert swagger_parser.get_example_from_prop_spec(prop_spec) == expected
+    # the given spec is left untouched
+    assert prop_spec == original_prop_spec
 
 
 def test_get_dict_definition(swagger_parser, pet_definition_example):
@@ -244,6 +320,18 @@ def test_get_path_spec(swagger_parser):
     assert swagger_parser.get_path_spec('/v2/stores/order/1253')[0] == '/v2/stores/order/{orderId}'
     assert swagger_parser.get_path_spec('/v2/stores/order/1253/123')[0] is None
     assert swagger_parser.get_path_spec('/v2/error')[0] is None
+    # Repeated lookups of the same path (last match is remembered)
+    assert swagger_parser.get_path_spec('/v2/stores/order/1253', 'get')[0] == '/v2/stores/order/{orderId}'
+    assert swagger_parser.get_path_spec('/v2/stores/order/1253', 'error') == (None, None)
+    assert swagger_parser.get_path_spec('/v2/stores/order/1253')[0] == '/v2/stores/order/{orderId}'
+
+
+def test_get_path_regex(swagger_parser):
+    assert swagger_parser._get_path_regex('/v2/pets/{petId}').match('/v2/pets/1253')
+    assert not swagger_parser._get_path_regex('/v2/pets/{petId}').match('/v2/pets/1253/123')
+    # Literal parts of the template are not regex syntax
+    assert swagger_parser._get_path_regex('/v2/{name}.json').match('/v2/pet.json')
+    assert not swagger_parser._get_path_regex('/v2/{name}.json').match('/v2/pet-json')
 
 
 def test_validate_request(swagger_parser, pet_definition_example):
@@ -296,6 +384,9 @@ def test_validate_request(swagger_parser, pet_definition_example):
     )
     # valid query
     assert swagger_parser.validate_request('/v2/pets/findByTags', 'get', query={'tags': ['string']})
+    # body schema with a simple type
+    assert swagger_parser.validate_request('/v2/users/username', 'put', body='user')
+    assert not swagger_parser.validate_request('/v2/users/username', 'put', body=42)
 
 
 def test_get_request_data(swagger_parser, pet_definition_example):
@@ -303,6 +394,30 @@ def test_get_request_data(swagger_parser, pet_definition_example):
     assert swagger_parser.get_request_data('/v2/pets/123', 'get') == {200: pet_definition_example, 400: '', 404: ''}
     assert swagger_parser.get_request_data('/v2/pets/123', 'error') == {400: ''}
 
+    # Each call gets its own response, including nested examples
+    response = swagger_parser.get_request_data('/v2/pets/123', 'get')
+    response[200] = None
+    assert swagger_parser.get_request_data('/v2/pets/123', 'get')[200] == pet_definition_example
+    swagger_parser.get_request_data('/v2/pets/findByStatus', 'get')[200].append(None)
+    assert swagger_parser.get_request_data('/v2/pets/findByStatus', 'get')[200] == [pet_definition_example]
+
+
+def test_get_request_data_follows_definitions_example(swagger_parser, pet_definition_example):
+    parser = deepcopy(swagger_parser)
+    assert parser.get_request_data('/v2/pets/123', 'get')[200] == pet_definition_example
+
+    parser.definitions_example['Pet'] = {'name': 'changed'}
+    assert parser.get_request_data('/v2/pets/123', 'get')[200] == {'name': 'changed'}
+    assert parser.get_send_request_correct_body('/v2/pets', 'post') == {'name': 'changed'}
+
+
+def test_lazy_examples(pet_definition_example):
+    parser = SwaggerParser(os.path.join(os.path.dirname(__file__), 'files', 'swagger.yaml'), lazy_examples=True)
+    assert parser.definitions_example == {}
+    assert parser.get_request_data('/v2/pets/123', 'get')[200] == pet_definition_example
+    assert parser.get_send_request_correct_body('/v2/pets', 'post') == pet_definition_example
+    assert 'Pet' in parser.definitions_example
+
 
 def test_get_send_request_correct_body(swagger_parser, pet_definition_example):
     assert swagger_parser.get_send_request_correct_body('/v2/pets', 'post') == pet_definition_example
@@ -310,6 +425,20 @@ def test_get_send_request_correct_body(swagger_parser, pet_definition_example):
     assert swagger_parser.get_send_request_correct_body('/v2/users/username', 'put') == 'string'
 
 
+@pytest.mark.parametrize('copy_parser', [
+    deepcopy,
+    lambda parser: pickle.loads(pickle.dumps(parser)),
+])
+def test_get_send_request_correct_body_on_copy(swagger_parser, pet_definition_example, copy_parser):
+    parser_copy = copy_parser(swagger_parser)
+    assert parser_copy.get_send_request_correct_body('/v2/pets', 'post') == pet_definition_example
+
+    # The copy builds its body from its own definitions
+    parser_copy.definitions_example['Pet'] = {'name': 'copy'}
+    assert parser_copy.get_send_request_correct_body('/v2/pets', 'post') == {'name': 'copy'}
+    assert swagger_parser.get_send_request_correct_body('/v2/pets', 'post') == pet_definition_example
+
+
 def test_array_definitions(swagger_array_parser):
     swagger_array_parser.build_definitions_example()
 